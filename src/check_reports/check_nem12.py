@@ -1,13 +1,46 @@
 #!/usr/bin/env python3
-"""NEM12 Comparator - Compare BEFORE and AFTER NEM12 reports sequentially."""
+"""NEM12 Comparator - Compare BEFORE and AFTER NEM12 reports pair by pair."""
 
 import json
+import logging
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 
-from src.check_reports.report_checker_engine import compare, write_issues_csv, Issue
+from src.check_reports.report_checker_engine import compare, IssueCsvWriter, Issue
+
+logger = logging.getLogger(__name__)
+
+
+class _CliFormatter(logging.Formatter):
+    """Plain message lines; warnings and errors are prefixed with their level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname}: {message}"
+        return message
+
+
+def configure_logging() -> None:
+    """Send progress and errors to stdout as plain lines (the CLI's output format)."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(_CliFormatter("%(message)s"))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+
+
+def _init_worker_logging(log_queue) -> None:
+    """Route a worker's log records to the main process through a queue."""
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
 
 
 def _project_root() -> Path:
@@ -21,26 +54,26 @@ def load_config(path: str = "config/metadata_mapping.json") -> dict:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except FileNotFoundError:
-        print(f"ERROR: Configuration file not found: {path}")
+        logger.error("Configuration file not found: %s", path)
         sys.exit(1)
     except json.JSONDecodeError as e:
-        print(f"ERROR: Invalid JSON in configuration file: {e}")
+        logger.error("Invalid JSON in configuration file: %s", e)
         sys.exit(1)
     except Exception as e:
-        print(f"ERROR: Failed to load configuration: {e}")
+        logger.error("Failed to load configuration: %s", e)
         sys.exit(1)
 
 
 def validate_file_path(file_path: Path, file_type: str) -> bool:
     """Validate that a file exists and is readable."""
     if not file_path.exists():
-        print(f"ERROR: {file_type} file not found: {file_path}")
+        logger.error("%s file not found: %s", file_type, file_path)
         return False
     if not file_path.is_file():
-        print(f"ERROR: {file_type} path is not a file: {file_path}")
+        logger.error("%s path is not a file: %s", file_type, file_path)
         return False
     if not file_path.stat().st_size > 0:
-        print(f"WARNING: {file_type} file is empty: {file_path}")
+        logger.warning("%s file is empty: %s", file_type, file_path)
     return True
 
 
@@ -62,35 +95,89 @@ def compare_pair_safely(
         if not validate_file_path(after_path, "AFTER"):
             return [], False
 
-        print(f"[{pair_index}/{total_pairs}] Comparing: {before_path.name} vs {after_path.name}")
+        logger.info("[%d/%d] Comparing: %s vs %s", pair_index, total_pairs, before_path.name, after_path.name)
         
-        # Perform comparison
-        issues = compare(str(before_path), str(after_path), comparison_id)
+        # Perform comparison (materialised here so the result can be
+        # returned from a worker process)
+        issues = list(compare(str(before_path), str(after_path), comparison_id))
         
         issue_count = len(issues)
-        print(f"[{pair_index}/{total_pairs}] Completed: {issue_count} issue(s) found")
+        logger.info("[%d/%d] Completed: %d issue(s) found", pair_index, total_pairs, issue_count)
         
         return issues, True
         
     except FileNotFoundError as e:
-        print(f"ERROR [{pair_index}/{total_pairs}]: File not found - {e}")
+        logger.error("[%d/%d] File not found - %s", pair_index, total_pairs, e)
         return [], False
     except PermissionError as e:
-        print(f"ERROR [{pair_index}/{total_pairs}]: Permission denied - {e}")
+        logger.error("[%d/%d] Permission denied - %s", pair_index, total_pairs, e)
         return [], False
     except UnicodeDecodeError as e:
-        print(f"ERROR [{pair_index}/{total_pairs}]: File encoding error - {e}")
+        logger.error("[%d/%d] File encoding error - %s", pair_index, total_pairs, e)
         return [], False
     except Exception as e:
-        print(f"ERROR [{pair_index}/{total_pairs}]: Unexpected error during comparison: {e}")
-        print(f"  Error type: {type(e).__name__}")
-        import traceback
-        print(f"  Traceback: {traceback.format_exc()}")
+        logger.error(
+            "[%d/%d] Unexpected error during comparison (%s): %s",
+            pair_index, total_pairs, type(e).__name__, e, exc_info=True,
+        )
         return [], False
 
 
+def _compare_group(jobs: List[tuple]) -> List[tuple[List[Issue], bool]]:
+    """Compare pairs that share a BEFORE file in one process, in order."""
+    return [compare_pair_safely(*job) for job in jobs]
+
+
+def run_pairs(jobs: List[tuple]) -> Iterator[tuple[List[Issue], bool]]:
+    """
+    Run compare_pair_safely for each job, yielding results in job order.
+    Pairs are independent parse+diff work, so they are spread over worker
+    processes. Pairs sharing a BEFORE file go to the same worker so the
+    engine's per-process parse cache is reused; with one such group or one
+    CPU they run in-process to avoid the cost of shipping issues back.
+    """
+    groups: Dict[Path, List[int]] = {}
+    for i, job in enumerate(jobs):
+        groups.setdefault(job[0], []).append(i)
+
+    workers = min(len(groups), os.cpu_count() or 1)
+    if workers <= 1:
+        for job in jobs:
+            yield compare_pair_safely(*job)
+        return
+
+    # Workers only enqueue log records; a single listener in this process
+    # writes them, so workers never contend on stdout
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(log_queue, *logging.getLogger().handlers)
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker_logging,
+            initargs=(log_queue,),
+        ) as executor:
+            # Job index -> (future for its group, position within the group)
+            placement = {}
+            for indices in groups.values():
+                future = executor.submit(_compare_group, [jobs[i] for i in indices])
+                for pos, i in enumerate(indices):
+                    placement[i] = (future, pos)
+            for i, job in enumerate(jobs):
+                future, pos = placement.pop(i)
+                try:
+                    yield future.result()[pos]
+                except Exception as e:
+                    pair_index, total_pairs = job[3], job[4]
+                    logger.error("[%d/%d] Worker process failed: %s", pair_index, total_pairs, e)
+                    yield [], False
+    finally:
+        listener.stop()
+
+
 def main() -> None:
-    """Main function with sequential comparison and error handling."""
+    """Main function with per-pair comparison and error handling."""
+    configure_logging()
     root = _project_root()
 
     try:
@@ -99,12 +186,12 @@ def main() -> None:
     except SystemExit:
         raise
     except Exception as e:
-        print(f"ERROR: Failed to initialize: {e}")
+        logger.error("Failed to initialize: %s", e)
         sys.exit(1)
 
     pairs = config.get("comparison_pairs", [])
     if not pairs:
-        print("ERROR: No comparison_pairs configured in config/metadata_mapping.json")
+        logger.error("No comparison_pairs configured in config/metadata_mapping.json")
         sys.exit(1)
 
     # Paths relative to project root (must match where download_nem12_reports.py saves files)
@@ -117,10 +204,9 @@ def main() -> None:
         after_dir.mkdir(parents=True, exist_ok=True)
         out_dir.mkdir(parents=True, exist_ok=True)
     except Exception as e:
-        print(f"ERROR: Failed to create directories: {e}")
+        logger.error("Failed to create directories: %s", e)
         sys.exit(1)
 
-    all_issues: List[Issue] = []
     successful_comparisons = 0
     failed_comparisons = 0
     skipped_pairs = 0
@@ -128,15 +214,16 @@ def main() -> None:
     last_after_name = ""
 
     total_pairs = len(pairs)
-    print(f"\nStarting comparison of {total_pairs} file pair(s)...\n")
+    logger.info("\nStarting comparison of %d file pair(s)...\n", total_pairs)
 
-    # Process each pair sequentially
+    # Collect the runnable pairs first; skipped pairs are reported up front
+    jobs = []
     for idx, pair in enumerate(pairs, start=1):
         before_file = pair.get("before_file")
         after_file = pair.get("after_file")
         
         if not before_file or not after_file:
-            print(f"[{idx}/{total_pairs}] SKIPPED: Missing file names in pair configuration")
+            logger.info("[%d/%d] SKIPPED: Missing file names in pair configuration", idx, total_pairs)
             skipped_pairs += 1
             continue
 
@@ -145,56 +232,62 @@ def main() -> None:
         comparison_id = f"RUN_{idx:03d}"
         last_before_name = before_file
         last_after_name = after_file
+        jobs.append((before_path, after_path, comparison_id, idx, total_pairs))
 
-        # Compare pair with error handling
-        issues, success = compare_pair_safely(
-            before_path,
-            after_path,
-            comparison_id,
-            idx,
-            total_pairs
-        )
-
-        if success:
-            all_issues.extend(issues)
-            successful_comparisons += 1
-        else:
-            failed_comparisons += 1
-            # Continue with next pair even if this one failed
-
-    # Generate output file
+    # Open the output file up front and write each pair's issues as soon as
+    # the pair completes, so issues never accumulate across the whole run
+    out_name = f"comparison_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    out_path = out_dir / out_name
     try:
-        out_name = f"comparison_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        out_path = out_dir / out_name
-        csv_path = write_issues_csv(
-            all_issues,
-            str(out_path),
-            before_file_name=last_before_name,
-            after_file_name=last_after_name,
-        )
+        writer = IssueCsvWriter(str(out_path))
     except Exception as e:
-        print(f"ERROR: Failed to write results CSV: {e}")
+        logger.error("Failed to write results CSV: %s", e)
         sys.exit(1)
 
+    with writer:
+        # Compare pairs (in parallel when there is more than one) and write
+        # results in configuration order so the CSV layout stays stable
+        for issues, success in run_pairs(jobs):
+            if success:
+                try:
+                    writer.write(issues)
+                except Exception as e:
+                    logger.error("Failed to write results CSV: %s", e)
+                    sys.exit(1)
+                successful_comparisons += 1
+            else:
+                failed_comparisons += 1
+                # Continue with next pair even if this one failed
+
+        try:
+            csv_path = writer.close(
+                before_file_name=last_before_name,
+                after_file_name=last_after_name,
+            )
+        except Exception as e:
+            logger.error("Failed to write results CSV: %s", e)
+            sys.exit(1)
+
     # Summary
-    total_issues = len(all_issues)
-    print("\n" + "="*60)
-    print("COMPARISON SUMMARY")
-    print("="*60)
-    print(f"Total pairs processed: {total_pairs}")
-    print(f"Successful: {successful_comparisons}")
-    print(f"Failed: {failed_comparisons}")
-    print(f"Skipped: {skipped_pairs}")
-    print(f"Total issues found: {total_issues}")
-    print(f"Results CSV: {csv_path}")
-    print("="*60)
+    total_issues = writer.count
+    logger.info("\n%s", "=" * 60)
+    logger.info("COMPARISON SUMMARY")
+    logger.info("="*60)
+    logger.info("Total pairs processed: %d", total_pairs)
+    logger.info("Successful: %d", successful_comparisons)
+    logger.info("Failed: %d", failed_comparisons)
+    logger.info("Skipped: %d", skipped_pairs)
+    logger.info("Total issues found: %d", total_issues)
+    logger.info("Results CSV: %s", csv_path)
+    logger.info("="*60)
 
     # Exit with error code if any comparisons failed
     if failed_comparisons > 0:
-        print(f"\nWARNING: {failed_comparisons} comparison(s) failed. Check errors above.")
+        logger.info("")
+        logger.warning("%d comparison(s) failed. Check errors above.", failed_comparisons)
         sys.exit(1)
     else:
-        print("\nStatus: All comparisons completed successfully")
+        logger.info("\nStatus: All comparisons completed successfully")
         sys.exit(0)
 
 
@@ -1,12 +1,16 @@
 """Core NEM12 comparison logic."""
 
 import csv
+import os
+import sys
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
 
-QUALITY_FLAGS = {"A", "V", "E", "F", "N", "S", "R", "C", "D"}
+QUALITY_FLAGS = frozenset({"A", "V", "E", "F", "N", "S", "R", "C", "D"})
 CSV_DELIMITERS = [",", "|", ";", "\t"]
 
 
@@ -15,19 +19,25 @@ def now_hhmmss_ddmmyy() -> str:
     return datetime.now().strftime("%H%M%S-%d%m%y")
 
 
-def detect_delimiter(file_path: str) -> str:
-    try:
-        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-            first_line = f.readline()
-        best = CSV_DELIMITERS[0]
-        best_count = first_line.count(best)
-        for d in CSV_DELIMITERS[1:]:
-            c = first_line.count(d)
-            if c > best_count:
-                best, best_count = d, c
-        return best
-    except Exception:
-        return CSV_DELIMITERS[0]
+def sniff_delimiter(first_line: str) -> str:
+    """Pick the most frequent delimiter in an already-read first line."""
+    counts = [first_line.count(d) for d in CSV_DELIMITERS]
+    # index() of the max keeps the earlier delimiter on ties.
+    return CSV_DELIMITERS[counts.index(max(counts))]
+
+
+def iter_rows(lines: Iterator[str], delimiter: str) -> Iterator[List[str]]:
+    """Split lines into fields, deferring to csv.reader once quoting appears.
+
+    NEM12 exports are normally unquoted, and for those a plain str.split()
+    gives the same fields as csv.reader at lower cost.
+    """
+    for line in lines:
+        if '"' in line:
+            yield from csv.reader(chain((line,), lines), delimiter=delimiter)
+            return
+        line = line.rstrip("\r\n")
+        yield line.split(delimiter) if line else []
 
 
 def normalize_cell(value: str) -> str:
@@ -59,29 +69,32 @@ def parse_interval_length_from_200(row: List[str]) -> int:
 
 
 def find_quality_index_for_300(row: List[str]) -> Optional[int]:
+    # QUALITY_FLAGS only holds single characters, so membership alone
+    # implies the length check.
     for i in range(len(row) - 4, 1, -1):
-        v = normalize_cell(row[i])
-        if len(v) == 1 and v in QUALITY_FLAGS:
+        if row[i].strip() in QUALITY_FLAGS:
             return i
     return None
 
 
-@dataclass(frozen=True)
-class IntervalKey:
+class IntervalKey(NamedTuple):
+    """Tuple-backed so hashing and equality run in C on every interval lookup."""
+
     nmi: str
     channel: str
     date: str
     interval_index: int
 
 
-@dataclass(frozen=True)
-class IntervalCell:
+class IntervalCell(NamedTuple):
+    """One stored interval value; a tuple avoids a per-instance __dict__."""
+
     value: str
     row_number: int
     cell_number: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Issue:
     comparison_id: str
     before_file: str
@@ -103,7 +116,7 @@ class Nem12Parsed:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.file_name = Path(file_path).name
-        self.delimiter = detect_delimiter(file_path)
+        self.delimiter = CSV_DELIMITERS[0]
         self.has_100 = False
         self.has_200 = False
         self.has_900 = False
@@ -112,12 +125,20 @@ class Nem12Parsed:
         self._current_nmi: Optional[str] = None
         self._current_channel: Optional[str] = None
         self._current_interval_len: int = 30
+        self._current_expected: int = 48
+        # Each date string appears once per channel; sharing one object per
+        # distinct date keeps the interval keys small and fast to compare.
+        self._dates: Dict[str, str] = {}
         self._parse()
 
     def _parse(self) -> None:
+        interval_map = self.interval_map
         with open(self.file_path, "r", encoding="utf-8", errors="replace") as f:
-            reader = csv.reader(f, delimiter=self.delimiter)
-            for row_num, row in enumerate(reader, start=1):
+            # Sniff the delimiter from the same handle instead of opening
+            # the file a second time.
+            self.delimiter = sniff_delimiter(f.readline())
+            f.seek(0)
+            for row_num, row in enumerate(iter_rows(iter(f), self.delimiter), start=1):
                 if not row:
                     continue
                 rec = normalize_cell(row[0])
@@ -129,9 +150,10 @@ class Nem12Parsed:
                     continue
                 if rec == "200":
                     self.has_200 = True
-                    self._current_nmi = safe_get(row, 1)
-                    self._current_channel = parse_channel_from_200(row)
+                    self._current_nmi = sys.intern(safe_get(row, 1))
+                    self._current_channel = sys.intern(parse_channel_from_200(row))
                     self._current_interval_len = parse_interval_length_from_200(row)
+                    self._current_expected = 48 if self._current_interval_len == 30 else max(1, (24 * 60) // max(1, self._current_interval_len))
                     continue
                 if rec == "900":
                     self.has_900 = True
@@ -144,73 +166,175 @@ class Nem12Parsed:
                     continue
 
                 date = safe_get(row, 1)
-                q_idx = find_quality_index_for_300(row)
+                date = self._dates.setdefault(date, date)
+                expected = self._current_expected
+                # Well-formed rows carry exactly `expected` values followed by
+                # the quality flag; only scan for the flag when that fails.
+                q_idx = 2 + expected
+                if q_idx >= len(row) or row[q_idx].strip() not in QUALITY_FLAGS:
+                    q_idx = find_quality_index_for_300(row)
                 if q_idx is not None and q_idx > 2:
-                    values = [normalize_cell(c) for c in row[2:q_idx]]
+                    raw_values = row[2:q_idx]
                 else:
-                    expected = 48 if self._current_interval_len == 30 else max(1, (24 * 60) // max(1, self._current_interval_len))
-                    values = [normalize_cell(c) for c in row[2 : 2 + expected]]
-
-                for idx, v in enumerate(values):
-                    key = IntervalKey(self._current_nmi, self._current_channel, date, idx)
-                    cell_number = 2 + idx + 1
-                    if key in self.interval_map and self.interval_map[key].value:
+                    raw_values = row[2 : 2 + expected]
+
+                # Strip while storing instead of building a normalised copy
+                # of the row first. NMI/channel only change on 200 records,
+                # so read them once per row rather than once per interval.
+                nmi = self._current_nmi
+                channel = self._current_channel
+                for idx, raw in enumerate(raw_values):
+                    v = raw.strip()
+                    key = IntervalKey(nmi, channel, date, idx)
+                    # Keep the first non-empty value seen for a key
+                    existing = interval_map.get(key)
+                    if existing is not None and existing.value:
                         continue
-                    self.interval_map[key] = IntervalCell(value=v, row_number=row_num, cell_number=cell_number)
+                    interval_map[key] = IntervalCell(v, row_num, 2 + idx + 1)
+
+
+@lru_cache(maxsize=2)
+def _parse_cached(file_path: str, mtime_ns: int, size: int) -> Nem12Parsed:
+    return Nem12Parsed(file_path)
+
+
+def load_parsed(file_path: str) -> Nem12Parsed:
+    """Parse a NEM12 file, reusing the last result while the file is unchanged.
+
+    Comparison runs often check one BEFORE file against several AFTER files;
+    the cache is keyed on path, mtime and size so an edited file is re-read.
+    The cache is per process: check_nem12.run_pairs sends every pair sharing
+    a BEFORE file to the same worker so those pairs actually hit it.
+    """
+    st = os.stat(file_path)
+    return _parse_cached(os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
 
 
-def compare(before_path: str, after_path: str, comparison_id: str) -> List[Issue]:
-    before = Nem12Parsed(before_path)
-    after = Nem12Parsed(after_path)
+def compare(before_path: str, after_path: str, comparison_id: str) -> Iterator[Issue]:
+    """Yield the issues found between two NEM12 files.
+
+    Both files are parsed on the first ``next()``; issues are then produced
+    one at a time so callers can stream them to disk.
+    """
+    before = load_parsed(before_path)
+    after = load_parsed(after_path)
     ts = now_hhmmss_ddmmyy()
-    issues: List[Issue] = []
+
+    def structure_issue(note: str) -> Issue:
+        return Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", note, ts)
 
     # Test 1: Verify structure (100/200/900)
     if before.first_record_type != "100":
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", f"BEFORE first record is {before.first_record_type}", ts))
+        yield structure_issue(f"BEFORE first record is {before.first_record_type}")
     if after.first_record_type != "100":
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", f"AFTER first record is {after.first_record_type}", ts))
+        yield structure_issue(f"AFTER first record is {after.first_record_type}")
     if not before.has_200:
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", "BEFORE missing any 200 record", ts))
+        yield structure_issue("BEFORE missing any 200 record")
     if not after.has_200:
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", "AFTER missing any 200 record", ts))
+        yield structure_issue("AFTER missing any 200 record")
     if not before.has_900:
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", "BEFORE missing 900 record", ts))
+        yield structure_issue("BEFORE missing 900 record")
     if not after.has_900:
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "STRUCTURE", "", "", "", "", "", "", "", "", "AFTER missing 900 record", ts))
+        yield structure_issue("AFTER missing 900 record")
 
     # Test 3: Missing/extra chunks
-    before_keys = set(before.interval_map.keys())
-    after_keys = set(after.interval_map.keys())
-    missing_in_after = before_keys - after_keys
-    extra_in_after = after_keys - before_keys
-
-    for k in sorted(missing_in_after, key=lambda x: (x.nmi, x.channel, x.date, x.interval_index)):
-        bcell = before.interval_map[k]
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "MISSING", k.nmi, k.channel, k.date, str(k.interval_index), str(bcell.row_number), "", bcell.value, "", "", ts))
-
-    for k in sorted(extra_in_after, key=lambda x: (x.nmi, x.channel, x.date, x.interval_index)):
-        acell = after.interval_map[k]
-        issues.append(Issue(comparison_id, before.file_name, after.file_name, "EXTRA", k.nmi, k.channel, k.date, str(k.interval_index), "", str(acell.row_number), "", acell.value, "", ts))
-
-    # Test 4: Value mismatches
-    common = before_keys & after_keys
-    for k in sorted(common, key=lambda x: (x.nmi, x.channel, x.date, x.interval_index)):
-        b = before.interval_map[k]
-        a = after.interval_map[k]
-        if b.value != a.value:
-            issues.append(Issue(comparison_id, before.file_name, after.file_name, "VALUE_MISMATCH", k.nmi, k.channel, k.date, str(k.interval_index), str(b.row_number), str(a.row_number), b.value, a.value, "", ts))
-
-    return issues
-
+    before_map = before.interval_map
+    after_map = after.interval_map
+    missing_in_after = before_map.keys() - after_map.keys()
+    extra_in_after = after_map.keys() - before_map.keys()
+
+    # IntervalKey tuples sort natively by (nmi, channel, date, interval_index).
+    for k in sorted(missing_in_after):
+        bcell = before_map[k]
+        yield Issue(comparison_id, before.file_name, after.file_name, "MISSING", k.nmi, k.channel, k.date, str(k.interval_index), str(bcell.row_number), "", bcell.value, "", "", ts)
+
+    for k in sorted(extra_in_after):
+        acell = after_map[k]
+        yield Issue(comparison_id, before.file_name, after.file_name, "EXTRA", k.nmi, k.channel, k.date, str(k.interval_index), "", str(acell.row_number), "", acell.value, "", ts)
+
+    # Test 4: Value mismatches (filter all common keys in one pass, then
+    # only order and format the ones that actually differ)
+    common = before_map.keys() & after_map.keys()
+    mismatched = [k for k in common if before_map[k].value != after_map[k].value]
+    for k in sorted(mismatched):
+        b = before_map[k]
+        a = after_map[k]
+        yield Issue(comparison_id, before.file_name, after.file_name, "VALUE_MISMATCH", k.nmi, k.channel, k.date, str(k.interval_index), str(b.row_number), str(a.row_number), b.value, a.value, "", ts)
+
+
+def classify_issue(i: Issue) -> tuple[str, str, str, str, str]:
+    """Map internal Issue to (issue_type, level, record_type, field_name, excel_cell)."""
+    t = i.issue_type.upper()
+    # Defaults
+    level = "ROW"
+    record_type = ""
+    field_name = ""
+    excel_cell = ""
+
+    if t == "VALUE_MISMATCH":
+        level = "CELL"
+        record_type = "300"
+        field_name = "IntervalValue"
+    elif t in {"MISSING", "EXTRA"}:
+        level = "ROW"
+        record_type = "300"
+    elif t == "STRUCTURE":
+        level = "METADATA"
+        record_type = ""
+        field_name = ""
 
-def write_issues_csv(
-    issues: List[Issue],
-    out_path: str,
-    before_file_name: str = "",
-    after_file_name: str = "",
-) -> str:
-    """Write issues in the simplified report format used by the tool.
+    return t, level, record_type, field_name, excel_cell
+
+
+def issue_csv_row(idx: int, i: Issue) -> List[object]:
+    """Build the detail row for one issue in the results CSV."""
+    issue_type, level, record_type, field_name, excel_cell = classify_issue(i)
+    # Cell location (primarily AFTER file)
+    cell_parts: List[str] = []
+    if i.after_row:
+        cell_parts.append(f"row {i.after_row}")
+    elif i.before_row:
+        cell_parts.append(f"row {i.before_row}")
+    if i.interval_index:
+        cell_parts.append(f"interval {i.interval_index}")
+    cell_loc = ", ".join(cell_parts)
+
+    # Human‑friendly details
+    if issue_type == "VALUE_MISMATCH":
+        details = (
+            f"Value mismatch between BEFORE and AFTER files "
+            f"({i.before_file}={i.before_value} vs {i.after_file}={i.after_value})."
+        )
+    elif issue_type == "MISSING":
+        details = (
+            "Interval present in BEFORE file but missing in AFTER file "
+            f"for NMI {i.nmi}, channel {i.channel}, date {i.date}, interval {i.interval_index}."
+        )
+    elif issue_type == "EXTRA":
+        details = (
+            "Extra interval present only in AFTER file (not in BEFORE file) "
+            f"for NMI {i.nmi}, channel {i.channel}, date {i.date}, interval {i.interval_index}."
+        )
+    else:  # STRUCTURE or other
+        details = i.note or ""
+
+    return [
+        idx,
+        issue_type,
+        i.nmi,
+        record_type,
+        i.channel,
+        i.date,
+        field_name,
+        cell_loc,
+        i.before_value,
+        i.after_value,
+        details,
+    ]
+
+
+class IssueCsvWriter:
+    """Write issues to the results CSV as they are produced.
 
     CSV layout:
     - Metadata header:
@@ -223,50 +347,32 @@ def write_issues_csv(
     - Detail header:
         Sr,issue_type,nmi,record_type,channel,date,
         field_name,after_cell_location,before_value,after_value,details
+
+    The header names the files of the first issue written; if no issue is
+    written, the names passed to close() are used instead.
     """
 
-    # Basic metadata
-    now = datetime.now()
-    report_date = now.strftime("%Y-%m-%d")
-    report_time = now.strftime("%H:%M:%S")
-
-    if issues:
-        before_name = issues[0].before_file
-        after_name = issues[0].after_file
-    else:
-        before_name = before_file_name
-        after_name = after_file_name
-
-    def classify(i: Issue) -> tuple[str, str, str, str, str]:
-        """Map internal Issue to (issue_type, level, record_type, field_name, excel_cell)."""
-        t = i.issue_type.upper()
-        # Defaults
-        level = "ROW"
-        record_type = ""
-        field_name = ""
-        excel_cell = ""
-
-        if t == "VALUE_MISMATCH":
-            level = "CELL"
-            record_type = "300"
-            field_name = "IntervalValue"
-        elif t in {"MISSING", "EXTRA"}:
-            level = "ROW"
-            record_type = "300"
-        elif t == "STRUCTURE":
-            level = "METADATA"
-            record_type = ""
-            field_name = ""
-
-        return t, level, record_type, field_name, excel_cell
-
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-
-        # Metadata header
+    def __init__(self, out_path: str):
+        self.out_path = out_path
+        self.count = 0
+        self._header_written = False
+        self._f = open(out_path, "w", newline="", encoding="utf-8")
+        self._w = csv.writer(self._f)
+
+    def __enter__(self) -> "IssueCsvWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def _write_header(self, before_name: str, after_name: str) -> None:
+        # Basic metadata
+        now = datetime.now()
+        w = self._w
         w.writerow(["Report_Name", "NEM12 Before vs After Comparison"])
-        w.writerow(["Report_Date", report_date])
-        w.writerow(["Report_Time", report_time])
+        w.writerow(["Report_Date", now.strftime("%Y-%m-%d")])
+        w.writerow(["Report_Time", now.strftime("%H:%M:%S")])
         w.writerow(["Before_Report", before_name])
         w.writerow(["After_Report", after_name])
         w.writerow([])  # blank separator row
@@ -287,53 +393,44 @@ def write_issues_csv(
                 "details",
             ]
         )
+        self._header_written = True
+
+    def write(self, issues: Iterable[Issue]) -> None:
+        """Append detail rows; Sr numbering continues across calls."""
+        it = iter(issues)
+        if not self._header_written:
+            first = next(it, None)
+            if first is None:
+                return
+            self._write_header(first.before_file, first.after_file)
+            it = chain((first,), it)
+        self._w.writerows(self._rows(it))
+
+    def _rows(self, issues: Iterator[Issue]) -> Iterator[List[object]]:
+        # Count as rows are pulled so writerows() can consume a generator.
+        for i in issues:
+            self.count += 1
+            yield issue_csv_row(self.count, i)
+
+    def close(self, before_file_name: str = "", after_file_name: str = "") -> str:
+        """Finish the file and return its absolute path."""
+        if not self._header_written:
+            self._write_header(before_file_name, after_file_name)
+        self._f.close()
+        return str(Path(self.out_path).absolute())
+
+
+def write_issues_csv(
+    issues: Iterable[Issue],
+    out_path: str,
+    before_file_name: str = "",
+    after_file_name: str = "",
+) -> str:
+    """Write issues in the simplified report format used by the tool.
 
-        # Detail rows
-        for idx, i in enumerate(issues, start=1):
-            issue_type, level, record_type, field_name, excel_cell = classify(i)
-            # Cell location (primarily AFTER file)
-            cell_parts: List[str] = []
-            if i.after_row:
-                cell_parts.append(f"row {i.after_row}")
-            elif i.before_row:
-                cell_parts.append(f"row {i.before_row}")
-            if i.interval_index:
-                cell_parts.append(f"interval {i.interval_index}")
-            cell_loc = ", ".join(cell_parts)
-
-            # Human‑friendly details
-            if issue_type == "VALUE_MISMATCH":
-                details = (
-                    f"Value mismatch between BEFORE and AFTER files "
-                    f"({i.before_file}={i.before_value} vs {i.after_file}={i.after_value})."
-                )
-            elif issue_type == "MISSING":
-                details = (
-                    "Interval present in BEFORE file but missing in AFTER file "
-                    f"for NMI {i.nmi}, channel {i.channel}, date {i.date}, interval {i.interval_index}."
-                )
-            elif issue_type == "EXTRA":
-                details = (
-                    "Extra interval present only in AFTER file (not in BEFORE file) "
-                    f"for NMI {i.nmi}, channel {i.channel}, date {i.date}, interval {i.interval_index}."
-                )
-            else:  # STRUCTURE or other
-                details = i.note or ""
-
-            w.writerow(
-                [
-                    idx,
-                    issue_type,
-                    i.nmi,
-                    record_type,
-                    i.channel,
-                    i.date,
-                    field_name,
-                    cell_loc,
-                    i.before_value,
-                    i.after_value,
-                    details,
-                ]
-            )
-
-    return str(Path(out_path).absolute())
+    See IssueCsvWriter for the layout. The file names are only used for the
+    header when there are no issues.
+    """
+    with IssueCsvWriter(out_path) as writer:
+        writer.write(issues)
+        return writer.close(before_file_name, after_file_name)
@@ -2,6 +2,9 @@
 
 from pathlib import Path
 
+# Repository root, so profile paths don't depend on the working directory
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
 BASE_URL = "https://metrixaidev.autoind.com.au"
 LOGIN_URL = f"{BASE_URL}/"
 DASHBOARD_URL = f"{BASE_URL}/dashboard"
@@ -16,6 +19,19 @@ DOWNLOAD_DIR = Path("Data/Downloaded_Reports")
 METADATA_OUT = Path("Results/report_metadata.json")
 TIMEOUT = 30000
 
+# Run Chromium without a window; set False to watch the run
+HEADLESS = True
+# Browser profile kept between runs so a saved session can skip the login
+# form; set to None to start from a fresh session every time. It holds the
+# session cookies and is git-ignored.
+USER_DATA_DIR = ROOT_DIR / "Data" / ".chromium-profile"
+
 # View Reports polling (UTC timestamp format dd-mm-YYYY HH:MM)
 POLL_MAX_MINUTES = 25
-POLL_INTERVAL_SECONDS = 30
+# Delay between status checks starts at POLL_BASE_SECONDS and grows by
+# POLL_BACKOFF each cycle, capped at POLL_MAX_SECONDS
+POLL_BASE_SECONDS = 2
+POLL_MAX_SECONDS = 30
+POLL_BACKOFF = 2
+# Log every refresh sub-step and empty poll, not just status changes
+VERBOSE = False
@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 """NEM12 Report Downloader - MetrixAI portal automation."""
 
+import argparse
 import asyncio
 import json
 import os
-import shutil
+import re
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
 # Load .env explicitly from project root
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -31,7 +33,6 @@ from pages.dashboard_page import DashboardPage
 from pages.nem12_report_page import NEM12ReportPage
 from pages.view_reports_page import ViewReportsPage
 from utils.logger import Logger
-from datetime import timezone
 import config  # type: ignore[attr-defined]
 
 # Type ignore for config module attributes (they exist at runtime but linter doesn't recognize them)
@@ -39,33 +40,147 @@ import config  # type: ignore[attr-defined]
 # pylint: disable=no-member
 
 
+DEFAULT_TARGET_ROOT = ROOT_DIR / "Data"
+EVENT_FOLDERS = {"before": "Before_Production", "after": "After_Production"}
+# How much of a downloaded file to scan for the first 200 (NMI) record
+NMI_SCAN_BYTES = 16384
+NMI_SCAN_LINES = 20
+# Characters not allowed in the report-name part of saved file names
+FILENAME_UNSAFE = re.compile(r"[^\w \-]")
+
+
+def _ddmmyyyy_to_yyyymmdd(s: str) -> str:
+    """'01/11/2025' -> '20251101'; raises ValueError on anything else."""
+    if len(s) == 10 and s[2] == "/" and s[5] == "/":
+        return datetime(int(s[6:10]), int(s[3:5]), int(s[0:2])).strftime("%Y%m%d")
+    return datetime.strptime(s, "%d/%m/%Y").strftime("%Y%m%d")
+
+
+# Blocking file I/O runs in a worker thread so Playwright's event loop keeps
+# processing browser events meanwhile.
+
+def _write_json_sync(path: Path, obj) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+
+
+def _read_head_sync(path: Path, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(size)
+
+
+async def _write_json(path: Path, obj) -> None:
+    await asyncio.to_thread(_write_json_sync, path, obj)
+
+
+async def _read_head(path: Path, size: int) -> bytes:
+    return await asyncio.to_thread(_read_head_sync, path, size)
+
+
+async def _mkdir(path: Path) -> None:
+    await asyncio.to_thread(path.mkdir, parents=True, exist_ok=True)
+
+
+async def _replace(src: Path, dst: Path) -> None:
+    await asyncio.to_thread(os.replace, src, dst)
+
+
+async def _unlink(path: Path) -> None:
+    await asyncio.to_thread(path.unlink, missing_ok=True)
+
+
 class NEM12Downloader:
-    def __init__(self):
+    def __init__(self, event: str, target_root: Path = DEFAULT_TARGET_ROOT):
         self.email = os.getenv("METRIXA_EMAIL")
         self.password = os.getenv("METRIXA_PASSWORD")
         self.download_dir = config.DOWNLOAD_DIR
-        self.download_dir.mkdir(parents=True, exist_ok=True)
         
         if not self.email or not self.password:
             raise ValueError("Missing credentials in .env file")
+        if event not in EVENT_FOLDERS:
+            raise ValueError(f"Invalid event '{event}' (expected 'before' or 'after')")
+
+        # Decided before the run starts so nothing waits on input after download
+        self.event_type = event.upper()
+        self.target_dir = Path(target_root) / EVENT_FOLDERS[event]
+
+        # Config dates (DD/MM/YYYY) as YYYYMMDD for the saved file name
+        try:
+            self.from_date_formatted = _ddmmyyyy_to_yyyymmdd(config.EXECUTE_FROM_DATE)
+            self.to_date_formatted = _ddmmyyyy_to_yyyymmdd(config.EXECUTE_TO_DATE)
+        except ValueError:
+            Logger.info(f"Could not parse dates from config, using defaults")
+            self.from_date_formatted = "00000000"
+            self.to_date_formatted = "00000000"
+
+    def _prepare_dirs(self) -> None:
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        config.METADATA_OUT.parent.mkdir(parents=True, exist_ok=True)
     
+    async def _find_execution(self, view: ViewReportsPage, page, exec_ts_utc: datetime, attempts: int = 3):
+        """Look up the execution row, retrying briefly while the results render."""
+        for attempt in range(attempts):
+            match = await view.find_execution_by_name(config.REPORT_NAME, exec_ts_utc)
+            if match is not None:
+                return match
+            if attempt + 1 < attempts:
+                await page.wait_for_timeout(1500 * (attempt + 1))
+        return None
+    
+    async def _prepare_results_view(self, view: ViewReportsPage, *, after_refresh: bool = False) -> bool:
+        """
+        Select NEM12 and search for the report's executions.
+        Used for the first search and again after each page refresh; returns
+        False (after logging why) if any step fails.
+        """
+        tag = "[Refresh] " if after_refresh else ""
+
+        def progress(step, msg: str) -> None:
+            if not after_refresh:
+                Logger.step(step, msg)
+            elif config.VERBOSE:
+                Logger.info(f"{tag}{msg}")
+
+        progress(17, "Set report type NEM12")
+        if not await view.set_report_type_nem12():
+            Logger.error(f"{tag}Failed to set report type to NEM12")
+            return False
+
+        progress(18, "Search executions")
+        if not await view.search_report(config.REPORT_NAME):
+            Logger.error(f"{tag}Failed to search for report executions")
+            return False
+
+        # Wait for search results to load (no-op if the spinner is already gone)
+        try:
+            await view.first(view.LOADING).wait_for(state="hidden", timeout=20000)
+        except Exception:
+            Logger.info(f"{tag}Loading spinner still visible; continuing")
+        return True
+
     async def run(self) -> bool:
         Logger.info("NEM12 Report Downloader")
+        Logger.info(f"Saving as {self.event_type} report to: {self.target_dir}")
         
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)
-            # Set up download path
-            context = await browser.new_context(accept_downloads=True)
-            page = await context.new_page()
-            
-            # Track download
-            download_info = {"download": None, "completed": False}
-            
-            async def handle_download(download):
-                download_info["download"] = download
-                Logger.info(f"Download started: {download.suggested_filename}")
-            
-            page.on("download", handle_download)
+            # Create output folders while Chromium starts up
+            browser = None
+            if config.USER_DATA_DIR:
+                context, _ = await asyncio.gather(
+                    p.chromium.launch_persistent_context(
+                        str(config.USER_DATA_DIR), headless=config.HEADLESS, accept_downloads=True
+                    ),
+                    asyncio.to_thread(self._prepare_dirs),
+                )
+                page = context.pages[0] if context.pages else await context.new_page()
+            else:
+                browser, _ = await asyncio.gather(
+                    p.chromium.launch(headless=config.HEADLESS),
+                    asyncio.to_thread(self._prepare_dirs),
+                )
+                # Set up download path
+                context = await browser.new_context(accept_downloads=True)
+                page = await context.new_page()
             
             try:
                 login = LoginPage(page, config.TIMEOUT)
@@ -73,23 +188,34 @@ class NEM12Downloader:
                 nem12 = NEM12ReportPage(page, config.TIMEOUT)
                 view = ViewReportsPage(page, config.TIMEOUT)
                 
-                Logger.step(1, f"Navigate: {config.LOGIN_URL}")
-                if not await login.navigate(config.LOGIN_URL):
-                    return False
+                # A saved profile may still hold a session; if the dashboard
+                # opens without a redirect to sign-in, skip steps 1-4
+                signed_in = False
+                if config.USER_DATA_DIR:
+                    # Ready once either the dashboard menu or the sign-in form shows
+                    ready = f"{dashboard.REPORTS_MENU} | {login.EMAIL_INPUT}"
+                    if await login.navigate(config.DASHBOARD_URL, ready) and page.url.startswith(config.DASHBOARD_URL):
+                        signed_in = True
+                        Logger.info("Reusing saved session, skipping login")
                 
-                Logger.step(2, "Enter credentials")
-                if not await login.enter_email(self.email or ""):
-                    return False
-                if not await login.enter_password(self.password or ""):
-                    return False
-                
-                Logger.step(3, "Click signin")
-                if not await login.click_signin():
-                    return False
-                
-                Logger.step(4, "Verify dashboard")
-                if not await dashboard.verify_dashboard_url(config.DASHBOARD_URL):
-                    return False
+                if not signed_in:
+                    Logger.step(1, f"Navigate: {config.LOGIN_URL}")
+                    if not await login.navigate(config.LOGIN_URL):
+                        return False
+                    
+                    Logger.step(2, "Enter credentials")
+                    if not await login.enter_email(self.email or ""):
+                        return False
+                    if not await login.enter_password(self.password or ""):
+                        return False
+                    
+                    Logger.step(3, "Click signin")
+                    if not await login.click_signin():
+                        return False
+                    
+                    Logger.step(4, "Verify dashboard")
+                    if not await dashboard.verify_dashboard_url(config.DASHBOARD_URL):
+                        return False
                 
                 Logger.step(5, "Click Reports menu")
                 if not await dashboard.click_reports_menu():
@@ -118,10 +244,6 @@ class NEM12Downloader:
 
                 Logger.step(11, "Read metadata")
                 meta = await nem12.read_metadata(config.REPORT_NAME)
-                meta_out = config.METADATA_OUT
-                meta_out.parent.mkdir(parents=True, exist_ok=True)
-                with open(meta_out, "w", encoding="utf-8") as f:
-                    json.dump(meta, f, indent=2)
 
                 Logger.step(12, "Back to list")
                 if not await nem12.click_back():
@@ -145,11 +267,10 @@ class NEM12Downloader:
                 exec_ts_str = exec_ts_utc.strftime('%d-%m-%Y %H:%M')
                 Logger.info(f"Recorded execution timestamp (UTC): {exec_ts_str}")
 
-                # Save execution timestamp to metadata
+                # Save metadata together with the execution timestamp
                 meta["execution_timestamp_utc"] = exec_ts_str
                 meta["execution_timestamp_datetime"] = exec_ts_utc.isoformat()
-                with open(meta_out, "w", encoding="utf-8") as f:
-                    json.dump(meta, f, indent=2)
+                await _write_json(config.METADATA_OUT, meta)
 
                 # Go to View Reports and poll status
                 Logger.step(16, "Open View Reports")
@@ -157,266 +278,118 @@ class NEM12Downloader:
                     Logger.error("Failed to open View Reports")
                     return False
 
-                Logger.step(17, "Set report type NEM12")
-                if not await view.set_report_type_nem12():
-                    Logger.error("Failed to set report type to NEM12")
-                    return False
-                await page.wait_for_timeout(500)
-
-                Logger.step(18, "Search executions")
-                if not await view.search_report(config.REPORT_NAME):
-                    Logger.error("Failed to search for report executions")
+                if not await self._prepare_results_view(view):
                     return False
-                
-                # Wait for search results to load
-                Logger.info("Waiting for search results to load...")
-                await page.wait_for_timeout(3000)
-                
-                # Wait for loading spinner to disappear if present
-                try:
-                    loading = page.locator(view.LOADING).first
-                    await loading.wait_for(state="visible", timeout=2000)
-                    await loading.wait_for(state="hidden", timeout=15000)
-                    Logger.info("Loading spinner disappeared")
-                except Exception:
-                    Logger.info("No loading spinner detected")
-                
-                await page.wait_for_timeout(2000)
-                Logger.info("Execution search submitted. Waiting for results...")
 
-                # Test: Verify we can find the report name in the table
-                Logger.step(18.1, "Verify report appears in results")
-                test_name_locator = view.REPORT_NAME_SPAN.format(name=config.REPORT_NAME)
-                
-                # Debug: Check if any spans with the report name exist
-                all_spans = page.locator('//span')
-                span_count = await all_spans.count()
-                Logger.info(f"Debug: Found {span_count} span elements on page")
-                
-                # Try to find report name with different approaches
-                found = False
-                try:
-                    await page.locator(test_name_locator).wait_for(state="visible", timeout=10000)
-                    found = True
-                    Logger.info(f"[OK] Report name '{config.REPORT_NAME}' found in results table")
-                except Exception as e:
-                    Logger.info(f"[WARN] Report name not found with exact match. Trying case-insensitive...")
-                    # Try case-insensitive search
-                    try:
-                        # Try finding any span containing the report name
-                        case_insensitive = f'//span[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "{config.REPORT_NAME.lower()}")]'
-                        await page.locator(case_insensitive).first.wait_for(state="visible", timeout=5000)
-                        found = True
-                        Logger.info(f"[OK] Report name found with case-insensitive search")
-                    except Exception:
-                        pass
-                
-                if not found:
-                    Logger.error(f"[FAIL] Report name '{config.REPORT_NAME}' not found in results table")
-                    Logger.info("Waiting additional 5 seconds for results to load...")
-                    await page.wait_for_timeout(5000)
-                    # Try again
-                    try:
-                        await page.locator(test_name_locator).wait_for(state="visible", timeout=10000)
-                        found = True
-                        Logger.info(f"[OK] Report name '{config.REPORT_NAME}' found after retry")
-                    except Exception:
-                        Logger.error("[FAIL] Report still not found. Check if search worked correctly.")
-                        Logger.info("Debug: Checking if search input has the correct value...")
-                        search_input_value = await page.locator(view.REPORT_NAME_INPUT).input_value()
+                # A new execution can take a while to show up in the table;
+                # the polling loop below keeps looking, so a miss is not fatal
+                Logger.step(18.1, "Find execution in results")
+                test_match = await self._find_execution(view, page, exec_ts_utc)
+                if test_match is None:
+                    Logger.warning("No execution found yet (this is normal if execution just started)")
+                    if config.VERBOSE:
+                        search_input_value = await view.locator(view.REPORT_NAME_INPUT).input_value()
                         Logger.info(f"Debug: Search input value is: '{search_input_value}'")
-                        Logger.info("Debug: Check browser window to see if results are displayed")
-                        return False
-
-                # Test: Verify we can read timestamp and status
-                Logger.step(18.2, "Test reading timestamp and status")
-                test_match = await view.find_execution_by_name(config.REPORT_NAME, exec_ts_utc)
-                if test_match:
+                else:
                     ts_str = test_match["timestamp"].strftime("%d-%m-%Y %H:%M") if test_match["timestamp"] else "UNKNOWN"
                     Logger.info(f"[OK] Found execution: Status='{test_match['status']}', Timestamp='{ts_str}'")
-                else:
-                    Logger.info("[WARN] No execution found yet (this is normal if execution just started)")
 
-                Logger.info(f"Polling every {config.POLL_INTERVAL_SECONDS}s for completion (max {config.POLL_MAX_MINUTES} minutes)")
+                Logger.info(f"Polling from {config.POLL_BASE_SECONDS}s up to every {config.POLL_MAX_SECONDS}s for completion (max {config.POLL_MAX_MINUTES} minutes)")
                 Logger.info("Page will refresh every 120 seconds to get latest status updates")
 
-                max_cycles = max(1, int((config.POLL_MAX_MINUTES * 60) / config.POLL_INTERVAL_SECONDS))
+                deadline = time.monotonic() + config.POLL_MAX_MINUTES * 60
                 latest_status = "UNKNOWN"
+                previous_status = None
                 refresh_interval_seconds = 120  # Refresh page every 120 seconds
-                cycles_since_refresh = 0
-                cycles_per_refresh = max(1, int(refresh_interval_seconds / config.POLL_INTERVAL_SECONDS))
+                last_refresh = time.monotonic()
+                delay = config.POLL_BASE_SECONDS
+                idx = 0
                 
-                for idx in range(max_cycles):
-                    await page.wait_for_timeout(500)
-                    
+                while time.monotonic() < deadline:
                     # Check if we need to refresh the page (every 120 seconds)
-                    if cycles_since_refresh >= cycles_per_refresh:
-                        Logger.info(f"[Refresh] Refreshing page to get latest status (after {cycles_since_refresh * config.POLL_INTERVAL_SECONDS} seconds)")
+                    since_refresh = time.monotonic() - last_refresh
+                    if since_refresh >= refresh_interval_seconds:
+                        Logger.info(f"[Refresh] Refreshing page to get latest status (after {int(since_refresh)} seconds)")
                         await page.reload()
-                        await page.wait_for_timeout(2000)
-                        
-                        # Re-set report type to NEM12
-                        Logger.info("[Refresh] Re-setting report type to NEM12")
-                        if not await view.set_report_type_nem12():
-                            Logger.error("[Refresh] Failed to set report type after refresh")
-                            return False
-                        await page.wait_for_timeout(1000)
                         
-                        # Re-search for report name
-                        Logger.info(f"[Refresh] Re-searching for report: {config.REPORT_NAME}")
-                        if not await view.search_report(config.REPORT_NAME):
-                            Logger.error("[Refresh] Failed to search for report after refresh")
+                        if not await self._prepare_results_view(view, after_refresh=True):
                             return False
                         
-                        # Wait for search results to load
-                        Logger.info("[Refresh] Waiting for search results to load...")
-                        await page.wait_for_timeout(3000)
-                        
-                        # Wait for loading spinner to disappear if present
-                        try:
-                            loading = page.locator(view.LOADING).first
-                            await loading.wait_for(state="visible", timeout=2000)
-                            await loading.wait_for(state="hidden", timeout=20000)
-                            Logger.info("[Refresh] Loading spinner disappeared")
-                        except Exception:
-                            Logger.info("[Refresh] No loading spinner detected")
-                        
-                        await page.wait_for_timeout(2000)
-                        
-                        # Verify report appears after refresh
-                        test_name_locator = view.REPORT_NAME_SPAN.format(name=config.REPORT_NAME)
-                        try:
-                            await page.locator(test_name_locator).wait_for(state="visible", timeout=10000)
-                            Logger.info(f"[Refresh] Report name '{config.REPORT_NAME}' found after refresh")
-                        except Exception:
-                            # Try case-insensitive
-                            try:
-                                case_insensitive = f'//span[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "{config.REPORT_NAME.lower()}")]'
-                                await page.locator(case_insensitive).first.wait_for(state="visible", timeout=10000)
-                                Logger.info(f"[Refresh] Report name found with case-insensitive search")
-                            except Exception:
-                                Logger.error(f"[Refresh] Report name '{config.REPORT_NAME}' not found after refresh")
-                                return False
-                        
-                        cycles_since_refresh = 0
+                        last_refresh = time.monotonic()
                         Logger.info("[Refresh] Page refreshed and settings restored. Continuing polling...")
                     
                     match = await view.find_execution_by_name(config.REPORT_NAME, exec_ts_utc)
                     if match:
                         latest_status = match["status"]
-                        ts_str = match["timestamp"].strftime("%d-%m-%Y %H:%M") if match["timestamp"] else "UNKNOWN"
-                        Logger.info(f"[Log {idx+1}] Report '{match['name']}' at {ts_str} UTC -> Status: {latest_status}")
+                        # Only report a poll when the status moved, unless verbose
+                        if config.VERBOSE or latest_status != previous_status:
+                            ts_str = match["timestamp"].strftime("%d-%m-%Y %H:%M") if match["timestamp"] else "UNKNOWN"
+                            Logger.info(f"[Log {idx+1}] Report '{match['name']}' at {ts_str} UTC -> Status: {latest_status}")
                         status_l = latest_status.lower()
                         if status_l == "completed":
                             Logger.step(19, "Download report")
-                            if not await view.download_row(match["row"], config.REPORT_NAME):
-                                Logger.error("Download click failed")
+                            try:
+                                async with page.expect_download(timeout=60000) as download_info:
+                                    if not await view.download_row(match["row"], config.REPORT_NAME):
+                                        # Leave the block early so it stops waiting for a download
+                                        raise RuntimeError("Download click failed")
+                                download = await download_info.value
+                            except RuntimeError as e:
+                                Logger.error(str(e))
                                 return False
-                            Logger.success("Download initiated successfully")
-                            
-                            # Wait for download to complete
-                            Logger.info("Waiting for download to complete...")
-                            max_wait = 60  # Wait up to 60 seconds for download
-                            waited = 0
-                            while download_info["download"] is None and waited < max_wait:
-                                await page.wait_for_timeout(1000)
-                                waited += 1
-                            
-                            if download_info["download"] is None:
+                            except PlaywrightTimeoutError:
                                 Logger.error("Download did not start within timeout")
                                 return False
+                            Logger.success("Download initiated successfully")
+                            Logger.info(f"Download started: {download.suggested_filename}")
                             
-                            # Wait for download to finish
+                            saved_path = None
                             try:
-                                download = download_info["download"]
-                                
-                                # Wait for download to complete (this blocks until file is downloaded)
-                                Logger.info("Waiting for file download to finish...")
-                                original_path = await download.path()
-                                Logger.success("Download completed")
-                                
                                 # Get original filename
                                 original_filename = download.suggested_filename
                                 
-                                # Load metadata to get report name and dates
-                                meta_path = config.METADATA_OUT  # type: ignore
-                                meta = {}
-                                if meta_path.exists():
-                                    with open(meta_path, "r", encoding="utf-8") as f:
-                                        meta = json.load(f)
+                                event_type = self.event_type
+                                target_dir = self.target_dir
                                 
-                                report_name = meta.get("report_name", config.REPORT_NAME)  # type: ignore
+                                # Create target directory if it doesn't exist
+                                await _mkdir(target_dir)
+                                Logger.info(f"Target directory: {target_dir}")
                                 
-                                # Get dates from config and convert to YYYYMMDD format
-                                from_date_str = config.EXECUTE_FROM_DATE  # type: ignore  # Format: DD/MM/YYYY
-                                to_date_str = config.EXECUTE_TO_DATE  # type: ignore  # Format: DD/MM/YYYY
+                                # Save straight into the target directory; the final
+                                # name needs the NMI, so it is renamed in place after
+                                Logger.info("Waiting for file download to finish...")
+                                saved_path = target_dir / f".{original_filename}.part"
+                                await download.save_as(saved_path)
+                                Logger.success("Download completed")
                                 
-                                try:
-                                    from_date = datetime.strptime(from_date_str, "%d/%m/%Y")
-                                    to_date = datetime.strptime(to_date_str, "%d/%m/%Y")
-                                    from_date_formatted = from_date.strftime("%Y%m%d")
-                                    to_date_formatted = to_date.strftime("%Y%m%d")
-                                except Exception:
-                                    Logger.info(f"Could not parse dates from config, using defaults")
-                                    from_date_formatted = "00000000"
-                                    to_date_formatted = "00000000"
+                                # Report name from the metadata read at step 11 (still in memory)
+                                report_name = meta.get("report_name", config.REPORT_NAME)
+                                
+                                from_date_formatted = self.from_date_formatted
+                                to_date_formatted = self.to_date_formatted
                                 
                                 # Extract NMI from downloaded file (first record type 200)
                                 nmi_number = "UNKNOWN_NMI"
                                 try:
                                     Logger.info("Extracting NMI from downloaded file...")
-                                    with open(original_path, 'r', encoding='utf-8') as f:
-                                        for line in f:
-                                            line = line.strip()
-                                            if not line:
-                                                continue
-                                            # Detect delimiter
-                                            delimiter = ',' if ',' in line else ('|' if '|' in line else '\t')
-                                            parts = line.split(delimiter)
-                                            if len(parts) > 1 and parts[0].strip() == '200':
-                                                # Record type 200: NMI is at index 1
-                                                nmi_number = parts[1].strip() if len(parts) > 1 else "UNKNOWN_NMI"
-                                                Logger.info(f"Found NMI: {nmi_number}")
-                                                break
+                                    # The 200 record sits near the top of the file, so only
+                                    # the head is read rather than the whole report
+                                    head = (await _read_head(saved_path, NMI_SCAN_BYTES)).decode('utf-8', 'ignore')
+                                    delimiter = ',' if ',' in head else ('|' if '|' in head else '\t')
+                                    for line in head.splitlines()[:NMI_SCAN_LINES]:
+                                        parts = line.strip().split(delimiter)
+                                        if len(parts) > 1 and parts[0].strip() == '200':
+                                            # Record type 200: NMI is at index 1
+                                            nmi_number = parts[1].strip()
+                                            Logger.info(f"Found NMI: {nmi_number}")
+                                            break
                                 except Exception as e:
                                     Logger.info(f"Could not extract NMI from file: {str(e)}")
                                     nmi_number = "UNKNOWN_NMI"
                                 
-                                # Prompt user for Before/After - this determines folder and filename
-                                Logger.info("\n" + "="*60)
-                                Logger.info("REPORT TYPE SELECTION")
-                                Logger.info("="*60)
-                                Logger.info("Which type of report is this?")
-                                Logger.info("  - BEFORE: Report before changes (saves to Before_Production folder)")
-                                Logger.info("  - AFTER:  Report after changes (saves to After_Production folder)")
-                                Logger.info("="*60)
-                                
-                                event_type = None
-                                target_dir = None
-                                
-                                while True:
-                                    user_input = input("\nEnter 'Before' or 'After' (or 'B'/'A'): ").strip().lower()
-                                    if user_input in ['before', 'b']:
-                                        event_type = "BEFORE"
-                                        target_dir = Path("D:/Projects/nem12_validator-main - Copy/data/Before_Production")
-                                        Logger.info(f"Selected: BEFORE report")
-                                        break
-                                    elif user_input in ['after', 'a']:
-                                        event_type = "AFTER"
-                                        target_dir = Path("D:/Projects/nem12_validator-main - Copy/data/After_Production")
-                                        Logger.info(f"Selected: AFTER report")
-                                        break
-                                    else:
-                                        Logger.error("Invalid input. Please enter 'Before' or 'After' (or 'B'/'A').")
-                                
-                                # Create target directory if it doesn't exist
-                                target_dir.mkdir(parents=True, exist_ok=True)
-                                Logger.info(f"Target directory: {target_dir}")
-                                
                                 # Create new filename: ReportName_NMINO_FROMDATE-TODATE_EVENT.ext
                                 # Clean report name for filename (remove special characters)
-                                clean_report_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in report_name)
-                                clean_report_name = clean_report_name.replace(' ', '_')
+                                clean_report_name = FILENAME_UNSAFE.sub('_', report_name).replace(' ', '_')
                                 
                                 # Get file extension from original filename
                                 if '.' in original_filename:
@@ -429,9 +402,9 @@ class NEM12Downloader:
                                 
                                 target_path = target_dir / new_filename
                                 
-                                # Move file to target directory with new name
-                                Logger.info(f"Moving file to: {target_path}")
-                                shutil.move(str(original_path), str(target_path))
+                                # Rename within the target directory (no copy)
+                                Logger.info(f"Saving file as: {target_path}")
+                                await _replace(saved_path, target_path)
                                 
                                 Logger.success("="*60)
                                 Logger.success("FILE SAVED SUCCESSFULLY")
@@ -451,15 +424,36 @@ class NEM12Downloader:
                                 Logger.error(f"Error handling download: {str(e)}")
                                 import traceback
                                 Logger.error(traceback.format_exc())
+                                # Don't leave a hidden partial file next to the reports
+                                if saved_path is not None:
+                                    try:
+                                        await _unlink(saved_path)
+                                    except OSError:
+                                        pass
                                 return False
                         if status_l == "failed":
                             Logger.error("Report execution failed")
                             return False
-                    else:
+                        # Poll quickly again whenever the status changes
+                        if latest_status != previous_status:
+                            delay = config.POLL_BASE_SECONDS
+                        previous_status = latest_status
+                    elif config.VERBOSE:
                         Logger.info(f"[Log {idx+1}] No executions found yet for '{config.REPORT_NAME}'. Retrying...")
                     
-                    cycles_since_refresh += 1
-                    await page.wait_for_timeout(config.POLL_INTERVAL_SECONDS * 1000)
+                    idx += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    # Watch the status in the browser rather than sleeping
+                    # blindly; this returns as soon as the run finishes. The
+                    # page is only reloaded once the refresh interval passes.
+                    # (Playwright reads timeout=0 as "no timeout", so never pass 0.)
+                    await view.wait_for_status_change(
+                        config.REPORT_NAME, exec_ts_utc,
+                        timeout_ms=max(1, int(min(delay, remaining) * 1000)),
+                    )
+                    delay = min(config.POLL_MAX_SECONDS, delay * config.POLL_BACKOFF)
 
                 Logger.error(f"Timeout waiting for completion (last status: {latest_status})")
                 return False
@@ -470,12 +464,46 @@ class NEM12Downloader:
                 Logger.error(str(e))
                 return False
             finally:
-                await browser.close()
+                # Closing a persistent context also shuts its browser down
+                await context.close()
+                if browser is not None:
+                    await browser.close()
+
+
+def prompt_event() -> str:
+    """Ask for BEFORE/AFTER up front when --event is not given."""
+    Logger.info("Which type of report is this?")
+    Logger.info("  - BEFORE: Report before changes (saves to Before_Production folder)")
+    Logger.info("  - AFTER:  Report after changes (saves to After_Production folder)")
+    while True:
+        Logger.flush()
+        user_input = input("\nEnter 'Before' or 'After' (or 'B'/'A'): ").strip().lower()
+        if user_input in ['before', 'b']:
+            return "before"
+        if user_input in ['after', 'a']:
+            return "after"
+        Logger.error("Invalid input. Please enter 'Before' or 'After' (or 'B'/'A').")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download a NEM12 report from the MetrixAI portal.")
+    parser.add_argument(
+        "--event",
+        choices=sorted(EVENT_FOLDERS),
+        help="Whether this is the BEFORE or AFTER report (prompted for if omitted)",
+    )
+    parser.add_argument(
+        "--target-root",
+        type=Path,
+        default=DEFAULT_TARGET_ROOT,
+        help=f"Folder holding Before_Production/ and After_Production/ (default: {DEFAULT_TARGET_ROOT})",
+    )
+    return parser.parse_args(argv)
 
 
-async def main():
+async def main(args: argparse.Namespace):
     try:
-        downloader = NEM12Downloader()
+        downloader = NEM12Downloader(args.event, args.target_root)
         success = await downloader.run()
         sys.exit(0 if success else 1)
     except ValueError as e:
@@ -487,4 +515,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.event is None:
+        args.event = prompt_event()
+    asyncio.run(main(args))
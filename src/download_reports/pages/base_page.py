@@ -1,45 +1,86 @@
 """Base page class with common functionality."""
 
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
-from typing import Optional
+from playwright.async_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+import json
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+def css_string(value: str) -> str:
+    """Quote a value for use inside a CSS attribute or :text-is() selector."""
+    return json.dumps(value)
+
+
+@lru_cache(maxsize=256)
+def name_selector(template: str, name: str) -> str:
+    """Fill a {name} selector template with the quoted name (cached)."""
+    return template.format(name=css_string(name))
 
 
 class BasePage:
     def __init__(self, page: Page, timeout: int = 30000):
         self.page = page
         self.timeout = timeout
+        # Set once on the page so individual actions don't each carry a timeout.
+        page.set_default_timeout(timeout)
+        page.set_default_navigation_timeout(timeout)
+        self._locators: Dict[str, Locator] = {}
+        self._first: Dict[str, Locator] = {}
+
+    def locator(self, selector: str) -> Locator:
+        """Locator for a selector, created once per page object and reused."""
+        loc = self._locators.get(selector)
+        if loc is None:
+            loc = self._locators[selector] = self.page.locator(selector)
+        return loc
+
+    def first(self, selector: str) -> Locator:
+        """First match of a selector, also created once and reused."""
+        loc = self._first.get(selector)
+        if loc is None:
+            loc = self._first[selector] = self.locator(selector).first
+        return loc
     
     async def wait_for_element(self, locator: str, state: str = "visible") -> bool:
         try:
-            await self.page.locator(locator).wait_for(state=state, timeout=self.timeout)
+            await self.locator(locator).wait_for(state=state)
             return True
         except PlaywrightTimeoutError:
             return False
     
+    # click() and fill() already wait for the element to be visible and
+    # actionable, so they are not preceded by a separate wait_for_element.
+
     async def click_element(self, locator: str) -> bool:
         try:
-            if await self.wait_for_element(locator, "visible"):
-                await self.page.locator(locator).click()
-                return True
-            return False
+            await self.locator(locator).click()
+            return True
         except Exception:
             return False
     
     async def fill_input(self, locator: str, value: str) -> bool:
         try:
-            if await self.wait_for_element(locator, "visible"):
-                await self.page.locator(locator).fill(value)
-                return True
+            await self.locator(locator).fill(value)
+            return True
+        except Exception:
             return False
+
+    async def wait_and_click_if_enabled(self, locator: str) -> bool:
+        """Wait for an element once, then click it if it is enabled."""
+        try:
+            el = self.locator(locator)
+            await el.wait_for(state="visible")
+            if not await el.is_enabled():
+                return False
+            await el.click()
+            return True
         except Exception:
             return False
 
     async def clear_and_type(self, locator: str, value: str) -> bool:
         """Clear then fill (useful for search inputs)."""
         try:
-            if not await self.wait_for_element(locator, "visible"):
-                return False
-            el = self.page.locator(locator)
+            el = self.locator(locator)
             await el.click()
             await el.fill("")
             await el.fill(value)
@@ -50,7 +91,7 @@ class BasePage:
     async def get_text(self, locator: str) -> Optional[str]:
         try:
             if await self.wait_for_element(locator, "visible"):
-                text = await self.page.locator(locator).text_content()
+                text = await self.locator(locator).text_content()
                 return text.strip() if text else None
             return None
         except Exception:
@@ -59,7 +100,7 @@ class BasePage:
     async def is_enabled(self, locator: str) -> bool:
         try:
             if await self.wait_for_element(locator, "visible"):
-                return await self.page.locator(locator).is_enabled()
+                return await self.locator(locator).is_enabled()
             return False
         except Exception:
             return False
@@ -68,7 +109,7 @@ class BasePage:
         try:
             await self.page.wait_for_url(
                 lambda url: url_pattern in url,
-                timeout=timeout or self.timeout
+                timeout=timeout
             )
             return True
         except PlaywrightTimeoutError:
@@ -77,9 +118,10 @@ class BasePage:
     async def set_value_js(self, locator: str, value: str) -> bool:
         """Set value via JS and dispatch input/change events."""
         try:
-            handle = self.page.locator(locator).first
+            handle = self.first(locator)
+            # Use the native setter so React-controlled inputs see the change
             await handle.evaluate(
-                "(el, val) => { el.value = val; el.dispatchEvent(new Event('input', {bubbles:true})); el.dispatchEvent(new Event('change', {bubbles:true})); }",
+                "(el, val) => { Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set.call(el, val); el.dispatchEvent(new Event('input', {bubbles:true})); el.dispatchEvent(new Event('change', {bubbles:true})); }",
                 value,
             )
             return True
@@ -7,6 +7,8 @@ from .base_page import BasePage
 class DashboardPage(BasePage):
     REPORTS_MENU = '//*[@title="Reports"]'
     NEM12_REPORT_LINK = '//*[@title="NEM12 Report"]'
+    # Shown once the NEM12 report list has rendered (its search box)
+    NEM12_PAGE_READY = 'input#name'
     
     def __init__(self, page: Page, timeout: int = 30000):
         super().__init__(page, timeout)
@@ -15,13 +17,18 @@ class DashboardPage(BasePage):
         return await self.wait_for_url(expected_url)
     
     async def click_reports_menu(self) -> bool:
-        if await self.click_element(self.REPORTS_MENU):
-            await self.page.wait_for_timeout(500)
-            return True
-        return False
+        if not await self.click_element(self.REPORTS_MENU):
+            return False
+        # The submenu is ready once its NEM12 link shows
+        try:
+            await self.locator(self.NEM12_REPORT_LINK).wait_for(state="visible", timeout=5000)
+        except Exception:
+            pass
+        return True
     
     async def click_nem12_report(self) -> bool:
-        if await self.click_element(self.NEM12_REPORT_LINK):
-            await self.page.wait_for_load_state("networkidle", timeout=self.timeout)
-            return True
-        return False
+        if not await self.click_element(self.NEM12_REPORT_LINK):
+            return False
+        # Wait for the report page itself; background polling can keep
+        # the network busy long after it is usable
+        return await self.wait_for_element(self.NEM12_PAGE_READY, "visible")
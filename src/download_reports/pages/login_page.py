@@ -1,5 +1,7 @@
 """Login page object."""
 
+from typing import Optional
+
 from playwright.async_api import Page
 from .base_page import BasePage
 
@@ -12,12 +14,13 @@ class LoginPage(BasePage):
     def __init__(self, page: Page, timeout: int = 30000):
         super().__init__(page, timeout)
     
-    async def navigate(self, url: str) -> bool:
+    async def navigate(self, url: str, ready: Optional[str] = None) -> bool:
+        """Open url and wait for the ready element (the email input by default)."""
         try:
-            await self.page.goto(url, wait_until="networkidle", timeout=self.timeout)
-            return True
+            await self.page.goto(url, wait_until="domcontentloaded")
         except Exception:
             return False
+        return await self.wait_for_element(ready or self.EMAIL_INPUT, "visible")
     
     async def enter_email(self, email: str) -> bool:
         return await self.fill_input(self.EMAIL_INPUT, email)
@@ -26,6 +29,4 @@ class LoginPage(BasePage):
         return await self.fill_input(self.PASSWORD_INPUT, password)
     
     async def click_signin(self) -> bool:
-        if not await self.is_enabled(self.SIGNIN_BUTTON):
-            return False
-        return await self.click_element(self.SIGNIN_BUTTON)
+        return await self.wait_and_click_if_enabled(self.SIGNIN_BUTTON)
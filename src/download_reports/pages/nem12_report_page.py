@@ -1,24 +1,33 @@
 """NEM12 Report page object."""
 
-from playwright.async_api import Page
-from .base_page import BasePage
+from types import MappingProxyType
+
+from playwright.async_api import Page, expect
+from .base_page import BasePage, css_string, name_selector
+
+# Month names as shown in the date picker header, mapped to 0-based index
+MONTH_INDEX = MappingProxyType({
+    "January": 0, "February": 1, "March": 2, "April": 3, "May": 4, "June": 5,
+    "July": 6, "August": 7, "September": 8, "October": 9, "November": 10, "December": 11
+})
+MONTH_NAMES = tuple(MONTH_INDEX)
 
 
 class NEM12ReportPage(BasePage):
-    PAGE_TITLE = '//*[@class="card-title mb-0"]'
+    PAGE_TITLE = '[class="card-title mb-0"]'
 
-    # Search/list view
-    SEARCH_INPUT = '//input[@id="name"]'
+    # Search/list view ({name} is filled by name_selector)
+    SEARCH_INPUT = 'input#name'
     SEARCH_BUTTON = '//button[text()="Search"]'
-    RESULT_NAME_SPAN = '//span[@title="{name}"]'
-    RESULT_VIEW_NAME_INPUT = '//input[@value="{name}"]'
+    RESULT_NAME_SPAN = 'span[title={name}]'
+    RESULT_VIEW_NAME_INPUT = 'input[value={name}]'
     BACK_BUTTON = '//button//span[text()=" Back"]'
-    ROW_CHECKBOX_BY_NAME = '//div[@role="row"]//span[@title="{name}"]/ancestor::div[@role="row"]//input[@type="checkbox"]'
+    ROW_CHECKBOX_BY_NAME = 'div[role="row"]:has(span[title={name}]) input[type="checkbox"]'
     EXECUTE_BUTTON = '//button[contains(@class,"btn-secondary") and .//i[contains(@class,"fa-calendar")] and contains(.,"Execute")]'
 
     # View mode fields
-    FALLBACK_INTERVAL = '//input[@id="fallback_interval_length"]'
-    MISSING_DATA_SELECT = '//select[@id="missing_data_handling"]'
+    FALLBACK_INTERVAL = 'input#fallback_interval_length'
+    MISSING_DATA_SELECT = 'select#missing_data_handling'
     CUM_SUB_SINGLE_VALUE = '//input[@id="cumulative_sub_type"]/ancestor::div[contains(@class,"css-ru69us-control")]//div[contains(@class,"singleValue")]'
     EXCLUDE_NULL_CHECKBOX = '//h5[contains(.,"Exclude null")]/ancestor::div[contains(@class,"card-header")]//input[@type="checkbox"]'
 
@@ -41,31 +50,74 @@ class NEM12ReportPage(BasePage):
         return title_text == expected_title
 
     async def search_report(self, report_name: str) -> bool:
-        # Ensure search input is editable, clear, type
-        if not await self.wait_for_element(self.SEARCH_INPUT, "visible"):
-            return False
-        if not await self.page.locator(self.SEARCH_INPUT).is_editable():
-            return False
-        if not await self.clear_and_type(self.SEARCH_INPUT, report_name):
+        # fill() waits for the input to be editable and replaces its text
+        if not await self.fill_input(self.SEARCH_INPUT, report_name):
             return False
         return await self.click_element(self.SEARCH_BUTTON)
 
     async def wait_for_result(self, report_name: str) -> bool:
-        locator = self.RESULT_NAME_SPAN.format(name=report_name)
+        locator = name_selector(self.RESULT_NAME_SPAN, report_name)
         return await self.wait_for_element(locator, "visible")
 
     async def open_result_view(self, report_name: str) -> bool:
-        locator = self.RESULT_NAME_SPAN.format(name=report_name)
+        locator = name_selector(self.RESULT_NAME_SPAN, report_name)
         if not await self.click_element(locator):
             return False
         # Verify view mode by checking name input value exists
-        return await self.wait_for_element(self.RESULT_VIEW_NAME_INPUT.format(name=report_name), "visible")
+        return await self.wait_for_element(name_selector(self.RESULT_VIEW_NAME_INPUT, report_name), "visible")
 
     async def read_metadata(self, report_name: str) -> dict:
+        # Read every field in one evaluate() round trip
+        try:
+            fields = await self.page.evaluate(
+                """(xp) => {
+                    const find = (sel) => sel.startsWith("/")
+                        ? document.evaluate(sel, document, null,
+                            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                        : document.querySelector(sel);
+                    const fallback = find(xp.fallback);
+                    const select = find(xp.missing);
+                    const missingValue = select ? (select.value || "").trim() : "";
+                    let missingLabel = "";
+                    if (select && missingValue) {
+                        const opt = Array.from(select.options).find((o) => o.value === missingValue);
+                        missingLabel = opt ? (opt.textContent || "").trim() : "";
+                    }
+                    const cum = find(xp.cum);
+                    const exclude = find(xp.exclude);
+                    return {
+                        fallback: fallback ? (fallback.value || "").trim() : "",
+                        missing_value: missingValue,
+                        missing_label: missingLabel,
+                        cum_sub: cum ? (cum.textContent || "").trim() : "",
+                        exclude_null: exclude ? !!exclude.checked : false,
+                    };
+                }""",
+                {
+                    "fallback": self.FALLBACK_INTERVAL,
+                    "missing": self.MISSING_DATA_SELECT,
+                    "cum": self.CUM_SUB_SINGLE_VALUE,
+                    "exclude": self.EXCLUDE_NULL_CHECKBOX,
+                },
+            )
+        except Exception:
+            return await self._read_metadata_by_locators(report_name)
+
+        return {
+            "report_name": report_name,
+            "fallback_interval": fields["fallback"],
+            "missing_data_handling_value": fields["missing_value"],
+            "missing_data_handling_label": fields["missing_label"],
+            "cumulative_substitution_type": fields["cum_sub"],
+            "exclude_null": fields["exclude_null"],
+        }
+
+    async def _read_metadata_by_locators(self, report_name: str) -> dict:
+        """Field-by-field fallback for read_metadata."""
         # FallBack Interval
         fallback = ""
         try:
-            fallback = (await self.page.locator(self.FALLBACK_INTERVAL).input_value()).strip()
+            fallback = (await self.locator(self.FALLBACK_INTERVAL).input_value()).strip()
         except Exception:
             fallback = ""
 
@@ -73,10 +125,10 @@ class NEM12ReportPage(BasePage):
         missing_value = ""
         missing_label = ""
         try:
-            sel = self.page.locator(self.MISSING_DATA_SELECT)
+            sel = self.locator(self.MISSING_DATA_SELECT)
             missing_value = (await sel.input_value()).strip()
             if missing_value:
-                opt = self.page.locator(f'{self.MISSING_DATA_SELECT}/option[@value="{missing_value}"]')
+                opt = self.locator(f'{self.MISSING_DATA_SELECT} > option[value={css_string(missing_value)}]')
                 missing_label = (await opt.text_content() or "").strip()
         except Exception:
             missing_value, missing_label = "", ""
@@ -87,7 +139,7 @@ class NEM12ReportPage(BasePage):
         # Exclude null checkbox
         exclude_null = False
         try:
-            exclude_null = await self.page.locator(self.EXCLUDE_NULL_CHECKBOX).is_checked()
+            exclude_null = await self.locator(self.EXCLUDE_NULL_CHECKBOX).is_checked()
         except Exception:
             exclude_null = False
 
@@ -104,10 +156,10 @@ class NEM12ReportPage(BasePage):
         return await self.click_element(self.BACK_BUTTON)
 
     async def select_report_checkbox(self, report_name: str) -> bool:
-        locator = self.ROW_CHECKBOX_BY_NAME.format(name=report_name)
+        locator = name_selector(self.ROW_CHECKBOX_BY_NAME, report_name)
         if not await self.wait_for_element(locator, "visible"):
             return False
-        cb = self.page.locator(locator)
+        cb = self.locator(locator)
         if await cb.is_checked():
             return True
         await cb.click()
@@ -134,71 +186,106 @@ class NEM12ReportPage(BasePage):
         if not parsed:
             return False
         target_day, target_month0, target_year = parsed
+        target_value = f"{date_str} 00:00"
+        date_input = self.first(input_locator)
+        # Scope picker relative to the input (first following picker)
+        picker_xpath = f'{input_locator}/following::div[contains(@class,"rdtPicker")][1]'
+        day_xpath = f'//td[@data-year="{target_year}"][@data-month="{target_month0}"][@data-value="{target_day}"]'
+
+        # Fast path: set the value directly. The input echoes typed text
+        # whether or not it parsed, so the date only counts as accepted once
+        # this field's (hidden) picker marks the target day as selected;
+        # otherwise drive the picker
+        if await self.set_value_js(input_locator, target_value):
+            try:
+                await expect(date_input).to_have_value(target_value, timeout=1000)
+                selected = self.locator(picker_xpath + day_xpath + '[contains(@class,"rdtActive")]')
+                await selected.wait_for(state="attached", timeout=1000)
+                return True
+            except Exception:
+                pass
 
         # Click input to open picker
         if not await self.click_element(input_locator):
             return False
 
-        # Scope picker relative to the input (first following picker)
-        picker = self.page.locator(f'{input_locator}/following::div[contains(@class,"rdtPicker")][1]')
-        header = picker.locator('xpath=.//th[contains(@class,"rdtSwitch")]').first
-        prev_btn = picker.locator('xpath=.//th[contains(@class,"rdtPrev")]').first
-        next_btn = picker.locator('xpath=.//th[contains(@class,"rdtNext")]').first
-
-        month_map = {
-            "January": 0, "February": 1, "March": 2, "April": 3, "May": 4, "June": 5,
-            "July": 6, "August": 7, "September": 8, "October": 9, "November": 10, "December": 11
-        }
+        picker = self.locator(picker_xpath)
+        header = self.first(picker_xpath + '//th[contains(@class,"rdtSwitch")]')
+        prev_btn = self.first(picker_xpath + '//th[contains(@class,"rdtPrev")]')
+        next_btn = self.first(picker_xpath + '//th[contains(@class,"rdtNext")]')
+
+        # Step to the target month inside the page in one round trip; the
+        # script reports whether the header now shows the target month
+        target_header = f"{MONTH_NAMES[target_month0]} {target_year}"
+        try:
+            reached = await picker.evaluate(
+                """async (root, tgt) => {
+                    const headerText = () => {
+                        const header = root.querySelector("th.rdtSwitch");
+                        return header ? header.textContent.trim() : "";
+                    };
+                    const parts = headerText().split(/\\s+/);
+                    const month = tgt.names.indexOf(parts[0]);
+                    const year = parseInt(parts[1], 10);
+                    if (parts.length !== 2 || month < 0 || isNaN(year)) return false;
+                    const delta = (tgt.year * 12 + tgt.month) - (year * 12 + month);
+                    for (let i = 0; i < Math.min(Math.abs(delta), 36); i++) {
+                        const btn = root.querySelector(delta < 0 ? "th.rdtPrev" : "th.rdtNext");
+                        if (!btn) return false;
+                        btn.click();
+                        await new Promise((r) => requestAnimationFrame(r));
+                    }
+                    return headerText().replace(/\\s+/g, " ") === tgt.header;
+                }""",
+                {"month": target_month0, "year": target_year, "names": list(MONTH_NAMES), "header": target_header},
+            )
+        except Exception:
+            reached = False
 
-        async def get_header_month_year():
-            text = (await header.text_content() or "").strip()
-            parts = text.split()
-            if len(parts) != 2:
-                return None
-            month_name, year = parts[0], int(parts[1])
-            if month_name not in month_map:
-                return None
-            return month_map[month_name], year
-
-        # Navigate months to target
-        for _ in range(36):  # guard to prevent infinite loop
-            current = await get_header_month_year()
-            if not current:
-                break
-            cur_month, cur_year = current
-            if cur_month == target_month0 and cur_year == target_year:
-                break
-            if (cur_year, cur_month) > (target_year, target_month0):
-                await prev_btn.click()
-            else:
-                await next_btn.click()
-            await self.page.wait_for_timeout(100)
+        # Fallback only when the script could not get there: read the header
+        # once, click prev/next for the remaining delta, then confirm
+        if not reached:
+            parts = (await header.text_content() or "").split()
+            if len(parts) == 2 and parts[0] in MONTH_INDEX and parts[1].isdigit():
+                delta = (target_year * 12 + target_month0) - (int(parts[1]) * 12 + MONTH_INDEX[parts[0]])
+                btn = next_btn if delta > 0 else prev_btn
+                for _ in range(min(abs(delta), 36)):  # guard against a bad header
+                    await btn.click()
+                if delta:
+                    try:
+                        await expect(header).to_have_text(target_header, timeout=2000)
+                    except AssertionError:
+                        pass
 
         # Click the day cell (filter out disabled/old/new classes)
-        day_locator = picker.locator(f'xpath=.//td[@data-year="{target_year}"][@data-month="{target_month0}"][@data-value="{target_day}"][not(contains(@class,"rdtDisabled"))][not(contains(@class,"rdtOld"))][not(contains(@class,"rdtNew"))]')
+        day_locator = self.locator(picker_xpath + day_xpath + '[not(contains(@class,"rdtDisabled"))][not(contains(@class,"rdtOld"))][not(contains(@class,"rdtNew"))]')
         try:
             await day_locator.first.click(timeout=5000)
-            await self.page.wait_for_timeout(100)
         except Exception:
             return False
+        try:
+            await expect(date_input).not_to_have_value("", timeout=2000)
+        except AssertionError:
+            pass
 
         # Click the time toggle (set to time view) if present
-        time_toggle = picker.locator('xpath=.//td[contains(@class,"rdtTimeToggle")]').first
+        time_toggle = self.first(picker_xpath + '//td[contains(@class,"rdtTimeToggle")]')
         try:
             await time_toggle.click(timeout=3000)
-            await self.page.wait_for_timeout(100)
         except Exception:
             pass
 
         # Force value via JS to ensure 00:00
-        target_value = f"{date_str} 00:00"
         await self.set_value_js(input_locator, target_value)
-        await self.page.wait_for_timeout(100)
+        try:
+            await expect(date_input).to_have_value(target_value, timeout=2000)
+        except AssertionError:
+            pass
         
         # Close picker by clicking modal header (outside picker)
         try:
-            await self.page.locator(self.MODAL_HEADER).click(timeout=2000)
-            await self.page.wait_for_timeout(100)
+            await self.locator(self.MODAL_HEADER).click(timeout=2000)
+            await picker.wait_for(state="hidden", timeout=2000)
         except Exception:
             pass
         return True
@@ -206,33 +293,32 @@ class NEM12ReportPage(BasePage):
     async def execute_with_dates(self, from_date: str, to_date: str) -> bool:
         if not await self.wait_for_element(self.MODAL, "visible"):
             return False
-        await self.page.wait_for_timeout(300)
         
         if not await self._select_date_from_picker(self.MODAL_FROM_INPUT, from_date):
             return False
-        await self.page.wait_for_timeout(200)
         
         if not await self._select_date_from_picker(self.MODAL_TO_INPUT, to_date):
             return False
-        await self.page.wait_for_timeout(200)
         
         # Click Execute
         if not await self.click_element(self.MODAL_EXECUTE_BUTTON):
             return False
-        await self.page.wait_for_timeout(500)
         
         # Wait for success alert container
-        container = self.page.locator(self.SUCCESS_ALERT_CONTAINER).first
+        container = self.first(self.SUCCESS_ALERT_CONTAINER)
         try:
             await container.wait_for(state="visible", timeout=10000)
         except Exception:
             return False
 
         # Click OK button (force if needed)
-        ok_button = self.page.locator(self.SUCCESS_OK).first
+        ok_button = self.first(self.SUCCESS_OK)
         try:
             await ok_button.click(timeout=5000, force=True)
-            await self.page.wait_for_timeout(500)
-            return True
         except Exception:
             return False
+        try:
+            await container.wait_for(state="hidden", timeout=5000)
+        except Exception:
+            pass
+        return True
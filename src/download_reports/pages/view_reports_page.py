@@ -2,27 +2,46 @@
 
 from datetime import datetime
 from typing import List, Optional, Dict
-from playwright.async_api import Page
-from .base_page import BasePage
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError, expect
+from .base_page import BasePage, name_selector
 from utils.logger import Logger
 
 
+def parse_execution_timestamp(raw: str) -> Optional[datetime]:
+    """Parse the portal's dd-mm-YYYY HH:MM[:SS] timestamps."""
+    # Fixed-width fast path; strptime covers anything else
+    try:
+        if (len(raw) == 16 or (len(raw) == 19 and raw[16] == ":")) and raw[2] == "-" and raw[5] == "-" and raw[10] == " " and raw[13] == ":":
+            second = int(raw[17:19]) if len(raw) == 19 else 0
+            return datetime(int(raw[6:10]), int(raw[3:5]), int(raw[0:2]), int(raw[11:13]), int(raw[14:16]), second)
+    except ValueError:
+        pass
+    for fmt in ("%d-%m-%Y %H:%M", "%d-%m-%Y %H:%M:%S"):
+        try:
+            return datetime.strptime(raw, fmt)
+        except ValueError:
+            pass
+    return None
+
+
 class ViewReportsPage(BasePage):
-    LINK_VIEW_REPORTS = '//a[@title="View Reports"]'
-    TITLE_VIEW_REPORTS = '//h5[text()="View Reports"]'
-    REPORT_TYPE_SELECT = '//select[@id="report_type"]'
-    REPORT_TYPE_OPTION_NEM12 = '//select[@id="report_type"]/option[@value="NEM12ReportExecutionLogs" and normalize-space()="NEM12"]'
-    REPORT_NAME_INPUT = '//input[@id="report_name"]'
+    LINK_VIEW_REPORTS = 'a[title="View Reports"]'
+    TITLE_VIEW_REPORTS = 'h5:text-is("View Reports")'
+    REPORT_TYPE_SELECT = 'select#report_type'
+    REPORT_TYPE_OPTION_NEM12 = 'select#report_type > option[value="NEM12ReportExecutionLogs"]:text-is("NEM12")'
+    REPORT_NAME_INPUT = 'input#report_name'
     SEARCH_BUTTON = '//button[text()="Search"]'
-    LOADING = '//div[contains(@class,"-loading") and contains(.,"Loading")]'
-
-    # New robust locators based on report name
-    REPORT_NAME_SPAN = '//span[normalize-space()="{name}"]'
-    ROW_BY_REPORT_NAME = '//span[normalize-space()="{name}"]/ancestor::div[@role="row"]'
-    TIMESTAMP_BY_REPORT_NAME = '//span[normalize-space()="{name}"]/ancestor::div[@role="row"]//div[7]//span'
-    STATUS_BY_REPORT_NAME = '//span[normalize-space()="{name}"]/ancestor::div[@role="row"]//span[contains(@class,"badge")]'
-    ACTION_BUTTON_BY_REPORT_NAME = '//span[normalize-space()="{name}"]/ancestor::div[@role="row"]//span[@data-toggle="dropdown"]'
-    DOWNLOAD_BUTTON_BY_REPORT_NAME = '//span[normalize-space()="{name}"]/ancestor::div[@role="row"]//button[@title="Download"]'
+    LOADING = 'div[class*="-loading"]:has-text("Loading")'
+
+    # Locators based on report name ({name} is filled by name_selector);
+    # :text-is() matches the whitespace-normalised text exactly
+    REPORT_NAME_SPAN = 'span:text-is({name})'
+    RESULT_ROW = 'div[role="row"]'
+    ROW_BY_REPORT_NAME = 'div[role="row"]:has(span:text-is({name}))'
+    TIMESTAMP_BY_REPORT_NAME = ROW_BY_REPORT_NAME + ' div:nth-of-type(7) span'
+    STATUS_BY_REPORT_NAME = ROW_BY_REPORT_NAME + ' span[class*="badge"]'
+    ACTION_BUTTON_BY_REPORT_NAME = ROW_BY_REPORT_NAME + ' span[data-toggle="dropdown"]'
+    DOWNLOAD_BUTTON_BY_REPORT_NAME = ROW_BY_REPORT_NAME + ' button[title="Download"]'
     
     # Legacy locators (kept for fallback)
     ROW_GROUPS = '//div[@class="rt-tr-group"]'
@@ -32,6 +51,25 @@ class ViewReportsPage(BasePage):
     ACTION_TOGGLE = './/div[contains(@class,"td-dropdown-toggle")]//span'
     ACTION_DOWNLOAD = './/div[contains(@class,"dropdown-menu")]//button[contains(@title,"Download")]'
 
+    # Collects {index, status, ts} for every result row holding a span whose
+    # text equals the lower-cased name, ignoring case. Only spans inside
+    # rows are compared, so the rest of the page is never scanned.
+    EXECUTION_ROWS_JS = """(name) => {
+        const norm = (t) => (t || "").replace(/\\s+/g, " ").trim().toLowerCase();
+        const out = [];
+        document.querySelectorAll('div[role="row"]').forEach((row, index) => {
+            if (!Array.from(row.querySelectorAll("span")).some((s) => norm(s.textContent) === name)) return;
+            const badge = row.querySelector(':scope span[class*="badge"]');
+            const tsEl = row.querySelector(":scope div:nth-of-type(7) span");
+            out.push({
+                index,
+                status: badge ? (badge.textContent || "").trim() : "",
+                ts: tsEl ? (tsEl.getAttribute("title") || tsEl.textContent || "").trim() : "",
+            });
+        });
+        return out;
+    }"""
+
     def __init__(self, page: Page, timeout: int = 30000):
         super().__init__(page, timeout)
 
@@ -43,27 +81,25 @@ class ViewReportsPage(BasePage):
     async def set_report_type_nem12(self) -> bool:
         """Select NEM12 in the report type dropdown using select_option (more stable)."""
         try:
-            select = self.page.locator(self.REPORT_TYPE_SELECT)
+            select = self.locator(self.REPORT_TYPE_SELECT)
             await select.select_option("NEM12ReportExecutionLogs")
             return True
         except Exception:
             return False
 
     async def search_report(self, name: str) -> bool:
-        if not await self.clear_and_type(self.REPORT_NAME_INPUT, name):
+        if not await self.fill_input(self.REPORT_NAME_INPUT, name):
             return False
-        await self.page.wait_for_timeout(300)
-        
-        # Verify input was filled correctly
-        input_value = await self.page.locator(self.REPORT_NAME_INPUT).input_value()
-        if input_value != name:
-            # Try filling again
-            await self.page.locator(self.REPORT_NAME_INPUT).fill(name)
-            await self.page.wait_for_timeout(300)
-        
+        # Make sure the input kept the value; fill once more if it did not
+        name_input = self.locator(self.REPORT_NAME_INPUT)
+        try:
+            await expect(name_input).to_have_value(name, timeout=2000)
+        except AssertionError:
+            await name_input.fill(name)
+
         try:
             # Search button is sometimes overlaid; use short timeout + force.
-            search_btn = self.page.locator(self.SEARCH_BUTTON).first
+            search_btn = self.first(self.SEARCH_BUTTON)
             await search_btn.wait_for(state="visible", timeout=5000)
             await search_btn.click(timeout=5000, force=True)
         except Exception as e:
@@ -71,7 +107,7 @@ class ViewReportsPage(BasePage):
 
         # If loading spinner shows up, wait for it to hide; otherwise continue quickly.
         try:
-            loading = self.page.locator(self.LOADING).first
+            loading = self.first(self.LOADING)
             await loading.wait_for(state="visible", timeout=1000)
             await loading.wait_for(state="hidden", timeout=20000)
         except Exception:
@@ -80,69 +116,27 @@ class ViewReportsPage(BasePage):
 
     async def find_execution_by_name(self, name: str, target_ts: Optional[datetime] = None) -> Optional[Dict]:
         """
-        Find execution row by report name using robust XPath locators.
+        Find execution row by report name (case-insensitive).
         Returns dict with name, status, timestamp, and row locator.
         """
         try:
-            # Wait for table to be visible
-            await self.page.wait_for_timeout(1000)
+            # Read status and timestamp for every matching row in one
+            # evaluate() call instead of several locator round trips per row
+            rows = await self.page.evaluate(self.EXECUTION_ROWS_JS, name.lower())
             
-            # Check if report name span exists
-            name_locator = self.REPORT_NAME_SPAN.format(name=name)
-            name_elements = self.page.locator(name_locator)
-            count = await name_elements.count()
-            
-            if count == 0:
+            if not rows:
                 return None
             
-            # Get all matching rows - iterate through each report name instance
+            result_rows = self.locator(self.RESULT_ROW)
             matches = []
-            for i in range(count):
-                try:
-                    # Get the specific name element and its parent row
-                    name_el = name_elements.nth(i)
-                    
-                    # Get the row ancestor for this specific name instance
-                    row = name_el.locator('xpath=./ancestor::div[@role="row"]')
-                    
-                    # Extract status relative to this row
-                    status_el = row.locator('xpath=.//span[contains(@class,"badge")]').first
-                    status = ""
-                    try:
-                        status = (await status_el.text_content() or "").strip()
-                    except Exception:
-                        pass
-                    
-                    # Extract timestamp relative to this row (div[7]//span)
-                    ts_el = row.locator('xpath=.//div[7]//span').first
-                    ts_raw = ""
-                    try:
-                        ts_raw = (await ts_el.get_attribute("title") or 
-                                 await ts_el.text_content() or "").strip()
-                    except Exception:
-                        pass
-                    
-                    # Parse timestamp (format: dd-mm-YYYY HH:MM)
-                    ts = None
-                    if ts_raw:
-                        try:
-                            ts = datetime.strptime(ts_raw, "%d-%m-%Y %H:%M")
-                        except ValueError:
-                            # Try alternative formats
-                            try:
-                                ts = datetime.strptime(ts_raw, "%d-%m-%Y %H:%M:%S")
-                            except ValueError:
-                                pass
-                    
-                    matches.append({
-                        "name": name,
-                        "status": status,
-                        "timestamp": ts,
-                        "row": row,
-                        "index": i
-                    })
-                except Exception as e:
-                    continue
+            for i, r in enumerate(rows):
+                matches.append({
+                    "name": name,
+                    "status": r["status"],
+                    "timestamp": parse_execution_timestamp(r["ts"]) if r["ts"] else None,
+                    "row": result_rows.nth(r["index"]),
+                    "index": i
+                })
             
             if not matches:
                 return None
@@ -173,6 +167,48 @@ class ViewReportsPage(BasePage):
         except Exception as e:
             return None
 
+    async def wait_for_status_change(self, name: str, target_ts: Optional[datetime] = None, timeout_ms: int = 60000) -> bool:
+        """
+        Wait in the browser until the execution find_execution_by_name would
+        pick (closest at or after target_ts) shows a terminal status.
+        Returns False on timeout.
+        """
+        # Compare timestamps as YYYYMMDDHHMMSSffffff strings on both sides,
+        # mirroring the datetime comparison in find_execution_by_name
+        target_key = target_ts.strftime("%Y%m%d%H%M%S%f") if target_ts else ""
+        try:
+            await self.page.wait_for_function(
+                """(args) => {
+                    const rows = (""" + self.EXECUTION_ROWS_JS + """)(args.name);
+                    if (!rows.length) return false;
+                    const key = (ts) => {
+                        const m = ts.match(/^(\\d{2})-(\\d{2})-(\\d{4}) (\\d{2}):(\\d{2})(?::(\\d{2}))?$/);
+                        return m ? m[3] + m[2] + m[1] + m[4] + m[5] + (m[6] || "00") + "000000" : null;
+                    };
+                    let after = null, before = null, latest = null;
+                    for (const r of rows) {
+                        r.key = key(r.ts);
+                        if (r.key === null) continue;
+                        if (!args.target) {
+                            if (!latest || r.key > latest.key) latest = r;
+                        } else if (r.key >= args.target) {
+                            if (!after || r.key < after.key) after = r;
+                        } else if (!before || r.key > before.key) {
+                            before = r;
+                        }
+                    }
+                    const pick = (args.target ? after || before : latest) || rows[0];
+                    const status = pick.status.toLowerCase();
+                    return status === "completed" || status === "failed";
+                }""",
+                arg={"name": name.lower(), "target": target_key},
+                timeout=timeout_ms,
+                polling=1000,
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
     async def find_latest_by_name(self, name: str, target_ts: Optional[datetime] = None) -> Optional[Dict]:
         """Legacy method - now uses find_execution_by_name"""
         return await self.find_execution_by_name(name, target_ts)
@@ -180,26 +216,24 @@ class ViewReportsPage(BasePage):
     async def download_row(self, row, report_name: str) -> bool:
         """
         Download report by clicking the action toggle and download button.
-        Uses new XPath locators based on report name.
+        Uses locators based on report name.
         """
         try:
-            # Use new XPath locators based on report name
-            action_button_locator = self.ACTION_BUTTON_BY_REPORT_NAME.format(name=report_name)
-            download_button_locator = self.DOWNLOAD_BUTTON_BY_REPORT_NAME.format(name=report_name)
+            # Locate the row's buttons by report name
+            action_button_locator = name_selector(self.ACTION_BUTTON_BY_REPORT_NAME, report_name)
+            download_button_locator = name_selector(self.DOWNLOAD_BUTTON_BY_REPORT_NAME, report_name)
             
             # Click action button (dropdown toggle) to open dropdown
             Logger.info(f"Clicking action button for report: {report_name}")
-            action_button = self.page.locator(action_button_locator).first
+            action_button = self.first(action_button_locator)
             await action_button.wait_for(state="visible", timeout=10000)
             await action_button.click(timeout=10000)
-            await self.page.wait_for_timeout(500)  # Wait for dropdown to open
             
             # Click download button
             Logger.info(f"Clicking download button for report: {report_name}")
-            download_button = self.page.locator(download_button_locator).first
+            download_button = self.first(download_button_locator)
             await download_button.wait_for(state="visible", timeout=10000)
             await download_button.click(timeout=10000)
-            await self.page.wait_for_timeout(500)
             return True
         except Exception as e:
             Logger.error(f"Download failed: {str(e)}")
@@ -1,23 +1,49 @@
 """Logger utility."""
 
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+_log = logging.getLogger("nem12")
+_log.setLevel(logging.INFO)
+_log.propagate = False
+
+# Callers only enqueue records; a background thread writes them to stdout,
+# so logging never blocks the asyncio loop on console I/O.
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("%(message)s"))
+_listener = QueueListener(_queue, _handler)
+_log.addHandler(QueueHandler(_queue))
+_listener.start()
+atexit.register(_listener.stop)
+
 
 class Logger:
     @staticmethod
     def info(msg: str):
-        print(f"[INFO] {msg}")
-    
+        _log.info("[INFO] %s", msg)
+
     @staticmethod
     def success(msg: str):
-        print(f"[OK] {msg}")
-    
+        _log.info("[OK] %s", msg)
+
     @staticmethod
     def error(msg: str):
-        print(f"[ERROR] {msg}")
-    
+        _log.error("[ERROR] %s", msg)
+
     @staticmethod
     def step(num, msg: str):
-        print(f"[Step {num}] {msg}")
-    
+        _log.info("[Step %s] %s", num, msg)
+
     @staticmethod
     def warning(msg: str):
-        print(f"[WARNING] {msg}")
\ No newline at end of file
+        _log.warning("[WARNING] %s", msg)
+
+    @staticmethod
+    def flush():
+        """Write out everything queued so far (e.g. before prompting)."""
+        _listener.stop()
+        _listener.start()